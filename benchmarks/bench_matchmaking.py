@@ -0,0 +1,80 @@
+"""
+Benchmark del matchmaking por buckets de rating
+
+Encola N jugadores con ratings aleatorios en un mismo juego y ejecuta rondas
+de emparejamiento (avanzando un reloj simulado) hasta vaciar la cola.
+Con --sparse cada jugador queda en un bucket aislado y nadie encuentra
+rival: mide el peor caso de latencia por ronda.
+
+Uso:
+    python -m benchmarks.bench_matchmaking --players 100000
+    python -m benchmarks.bench_matchmaking --players 100000 --sparse
+"""
+
+import argparse
+import random
+import time
+
+from retroarcade_hub.app.config import (
+    MATCHMAKING_BUCKET_SIZE,
+    MATCHMAKING_MAX_TICKETS_PER_TICK,
+    MATCHMAKING_MAX_WINDOW_BUCKETS,
+    MATCHMAKING_TICK_SECONDS,
+    MATCHMAKING_WINDOW_GROWTH_SECONDS,
+)
+from retroarcade_hub.app.matchmaking import MatchmakingService
+
+
+def run(players: int, seed: int, sparse: bool) -> None:
+    rng = random.Random(seed)
+    service = MatchmakingService()
+    if sparse:
+        gap = MATCHMAKING_BUCKET_SIZE * (MATCHMAKING_MAX_WINDOW_BUCKETS + 1)
+        ratings = [i * gap for i in range(players)]
+    else:
+        ratings = [max(1000, int(rng.gauss(5000, 1500))) for _ in range(players)]
+
+    start = time.perf_counter()
+    for player_id, rating in enumerate(ratings, start=1):
+        service.enqueue(player_id, "Street Fighter II", rating, now=0.0)
+    enqueue_seconds = time.perf_counter() - start
+
+    now = 0.0
+    ticks = 0
+    total_matches = 0
+    tick_seconds = 0.0
+    slowest_tick = 0.0
+    idle_ticks = 0
+    max_wait = MATCHMAKING_WINDOW_GROWTH_SECONDS * MATCHMAKING_MAX_WINDOW_BUCKETS
+    queue = service.queues["Street Fighter II"]
+    while len(queue) > 1:
+        start = time.perf_counter()
+        matches = service.tick(now)
+        elapsed = time.perf_counter() - start
+        tick_seconds += elapsed
+        slowest_tick = max(slowest_tick, elapsed)
+        total_matches += len(matches)
+        ticks += 1
+        idle_ticks = 0 if matches or now < max_wait else idle_ticks + 1
+        if idle_ticks * MATCHMAKING_MAX_TICKETS_PER_TICK > len(queue):
+            break  # Ventanas al máximo y cola recorrida entera sin rivales
+        now += MATCHMAKING_TICK_SECONDS
+
+    print(f"Jugadores encolados:  {players}")
+    print(f"Encolado:             {enqueue_seconds:.3f} s ({players / enqueue_seconds:,.0f} jugadores/s)")
+    print(f"Rondas:               {ticks}")
+    print(f"Emparejamientos:      {total_matches}")
+    print(f"Sin rival:            {len(queue)}")
+    print(f"Tiempo emparejando:   {tick_seconds:.3f} s")
+    print(f"Ronda más lenta:      {slowest_tick * 1000:.1f} ms")
+    if total_matches:
+        print(f"Emparejamientos/s:    {total_matches / tick_seconds:,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--players", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sparse", action="store_true")
+    args = parser.parse_args()
+    run(args.players, args.seed, args.sparse)
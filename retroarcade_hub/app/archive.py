@@ -0,0 +1,114 @@
+"""
+Archivado de torneos completados (datos calientes / fríos)
+
+Mueve por lotes los torneos completados y sus participaciones desde la base
+principal a la base de archivo adjunta (archive.*), para que las tablas e
+índices que usan las consultas en vivo se mantengan pequeños:
+
+    python -m retroarcade_hub.app.archive --older-than-days 30
+"""
+
+import argparse
+from datetime import datetime, timedelta
+from typing import Tuple
+
+from sqlalchemy import delete, func, select
+
+from .config import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE
+from .db import engine
+from .models import (
+    ArchivedTournament,
+    ArchivedTournamentParticipation,
+    Base,
+    Tournament,
+    TournamentParticipation,
+)
+
+
+def _move_rows(connection, source, target, where) -> int:
+    """Copiar filas con INSERT ... SELECT y borrarlas del origen"""
+    columns = [column.name for column in source.columns]
+    connection.execute(
+        target.insert().from_select(columns, select(*source.columns).where(where))
+    )
+    return connection.execute(delete(source).where(where)).rowcount
+
+
+def _reuses_ids(connection, table) -> bool:
+    """Indicar si la tabla se creó sin AUTOINCREMENT (bases anteriores)"""
+    sql = connection.exec_driver_sql(
+        "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?",
+        (table.name,),
+    ).scalar()
+    return "AUTOINCREMENT" not in (sql or "").upper()
+
+
+def archive_completed_tournaments(
+    bind=engine,
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+) -> Tuple[int, int]:
+    """
+    Archivar torneos completados cuyo end_date supera la antigüedad indicada.
+
+    Cada lote se mueve en su propia transacción (ambos ficheros se confirman
+    juntos). Devuelve (torneos, participaciones) archivados.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    tournaments = Tournament.__table__
+    participations = TournamentParticipation.__table__
+
+    # En tablas creadas sin AUTOINCREMENT SQLite reutiliza el id más alto si se
+    # borra; esos torneos se quedan en caliente para no duplicar ids archivados
+    filters = [tournaments.c.status == "completed", tournaments.c.end_date < cutoff]
+    with bind.connect() as connection:
+        if _reuses_ids(connection, tournaments):
+            filters.append(tournaments.c.id != select(func.max(tournaments.c.id)).scalar_subquery())
+        if _reuses_ids(connection, participations):
+            filters.append(tournaments.c.id.not_in(
+                select(participations.c.tournament_id).where(
+                    participations.c.id == select(func.max(participations.c.id)).scalar_subquery(),
+                    participations.c.tournament_id.is_not(None),
+                )
+            ))
+
+    archived_tournaments = archived_participations = 0
+    while True:
+        with bind.begin() as connection:
+            ids = connection.execute(
+                select(tournaments.c.id)
+                .where(*filters)
+                .order_by(tournaments.c.id)
+                .limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+
+            # Primero las participaciones para no dejar filas huérfanas
+            archived_participations += _move_rows(
+                connection,
+                participations,
+                ArchivedTournamentParticipation.__table__,
+                participations.c.tournament_id.in_(ids),
+            )
+            archived_tournaments += _move_rows(
+                connection,
+                tournaments,
+                ArchivedTournament.__table__,
+                tournaments.c.id.in_(ids),
+            )
+
+    return archived_tournaments, archived_participations
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archivar torneos completados")
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    tournaments_count, participations_count = archive_completed_tournaments(
+        older_than_days=args.older_than_days, batch_size=args.batch_size
+    )
+    print(f"✅ Archivados {tournaments_count} torneos y {participations_count} participaciones")
@@ -2,6 +2,8 @@
 Configuración de la aplicación RetroArcade Hub
 """
 
+import os
+
 # URL de conexión a la base de datos
 SQLALCHEMY_DATABASE_URL = "sqlite:///./retroarcade.db"
 
@@ -34,4 +36,20 @@ API_VERSION = "1.0.0"
 # Configuración de seguridad (simulada)
 JWT_SECRET_KEY = "your-super-secret-jwt-key"
 JWT_ALGORITHM = "HS256"
-JWT_ACCESS_TOKEN_EXPIRE_MINUTES = 30
\ No newline at end of file
+JWT_ACCESS_TOKEN_EXPIRE_MINUTES = 30
+
+# Configuración del matchmaking
+MATCHMAKING_BUCKET_SIZE = 100  # puntos de rating por bucket
+MATCHMAKING_WINDOW_GROWTH_SECONDS = 10  # segundos de espera para ampliar la ventana un bucket
+MATCHMAKING_MAX_WINDOW_BUCKETS = 10  # máxima distancia en buckets para emparejar
+MATCHMAKING_TICK_SECONDS = 1.0  # intervalo entre rondas de emparejamiento
+MATCHMAKING_MAX_TICKETS_PER_TICK = 5_000  # tickets revisados por cola y ronda (acota la latencia)
+MATCHMAKING_MATCH_TTL_SECONDS = 300  # tiempo que se conserva el resultado de un emparejamiento
+
+# Configuración del archivo histórico (base de datos adjunta como "archive")
+ARCHIVE_DATABASE_PATH = "./retroarcade_archive.db"
+ARCHIVE_AFTER_DAYS = 30  # días desde end_date para archivar un torneo completado
+ARCHIVE_BATCH_SIZE = 500  # torneos movidos por transacción
+
+# Snapshot opcional para sembrar una base vacía al iniciar (ver app/snapshot.py)
+SAMPLE_DATA_SNAPSHOT = os.environ.get("RETROARCADE_SEED_SNAPSHOT")
@@ -2,11 +2,11 @@
 Configuración de la base de datos para RetroArcade Hub
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-from .config import SQLALCHEMY_DATABASE_URL
+from .config import ARCHIVE_DATABASE_PATH, SQLALCHEMY_DATABASE_URL
 
 # Crear el motor de SQLAlchemy
 engine = create_engine(
@@ -14,6 +14,20 @@ engine = create_engine(
     connect_args={"check_same_thread": False}  # Solo necesario para SQLite
 )
 
+def attach_archive(bind, archive_path: str = ARCHIVE_DATABASE_PATH):
+    """
+    Adjuntar la base de datos de archivo en cada conexión del motor.
+    
+    Los torneos archivados viven en otro fichero, accesible como archive.*;
+    cada motor (p. ej. uno temporal en tests) puede usar su propio fichero.
+    """
+    @event.listens_for(bind, "connect")
+    def _attach(dbapi_connection, connection_record):
+        dbapi_connection.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+    return bind
+
+attach_archive(engine)
+
 # Crear una sesión local
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -3,18 +3,71 @@ Punto de entrada principal para la API RetroArcade Hub
 """
 
 from fastapi import FastAPI
-from contextlib import asynccontextmanager
+from sqlalchemy import delete, func, inspect, select, update
+from contextlib import asynccontextmanager, suppress
+import asyncio
 import json
 from datetime import datetime, timedelta
 
 from .db import engine, SessionLocal
-from .models import Base, PowerUp, Tournament
-from .config import API_TITLE, API_DESCRIPTION, API_VERSION, API_PREFIX
-from .routers import players, tournaments, power_ups, auth
+from .models import Base, PlayerPowerUp, PowerUp, Tournament
+from .config import API_TITLE, API_DESCRIPTION, API_VERSION, API_PREFIX, SAMPLE_DATA_SNAPSHOT
+from .matchmaking import matchmaking_service
+from .routers import players, tournaments, power_ups, auth, matchmaking
+from .snapshot import import_snapshot
+from .stats import rebuild_player_stats
+
+def merge_duplicate_inventory(connection):
+    """
+    Fusionar filas repetidas de (player_id, power_up_id) en el inventario.
+    
+    Las bases anteriores al índice único admitían duplicados: se conserva la
+    fila de menor id con la suma de cantidades y se borran las demás.
+    """
+    inventory = PlayerPowerUp.__table__
+    same = inventory.alias()
+    keyed = (inventory.c.player_id.is_not(None), inventory.c.power_up_id.is_not(None))
+    first_ids = select(func.min(inventory.c.id)).group_by(
+        inventory.c.player_id, inventory.c.power_up_id
+    )
+    total = select(func.sum(func.coalesce(same.c.quantity, 0))).where(
+        same.c.player_id == inventory.c.player_id,
+        same.c.power_up_id == inventory.c.power_up_id
+    ).scalar_subquery()
+    
+    connection.execute(
+        update(inventory)
+        .where(*keyed, inventory.c.id.in_(first_ids.having(func.count() > 1)))
+        .values(quantity=total)
+    )
+    connection.execute(delete(inventory).where(*keyed, inventory.c.id.not_in(first_ids)))
 
 # Crear las tablas en la base de datos
+stats_table_exists = inspect(engine).has_table("player_stats")
 Base.metadata.create_all(bind=engine)
 
+# Backfill de player_stats la primera vez que se crea sobre datos existentes
+if not stats_table_exists:
+    with engine.begin() as connection:
+        rebuild_player_stats(connection)
+
+# create_all no agrega columnas nuevas a tablas que ya existen
+purchase_columns = {column["name"] for column in inspect(engine).get_columns("purchases")}
+if "coins" not in purchase_columns:
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ALTER TABLE purchases ADD COLUMN coins INTEGER")
+
+# El índice único del inventario no puede crearse si quedan duplicados
+inventory_indexes = {index["name"] for index in inspect(engine).get_indexes("player_power_ups")}
+if "ix_player_power_ups_player_power_up" not in inventory_indexes:
+    with engine.begin() as connection:
+        merge_duplicate_inventory(connection)
+
+# create_all no agrega índices nuevos a tablas que ya existen
+for table in Base.metadata.sorted_tables:
+    for index in table.indexes:
+        index.create(bind=engine, checkfirst=True)
+
 # Función para crear datos de ejemplo en el evento de inicio
 async def create_sample_data():
     """Crear datos de ejemplo para testing"""
@@ -25,6 +78,12 @@ async def create_sample_data():
         if db.query(Tournament).first():
             return
         
+        # Sembrar desde un snapshot (p. ej. generado a escala de benchmark)
+        if SAMPLE_DATA_SNAPSHOT:
+            counts = import_snapshot(SAMPLE_DATA_SNAPSHOT)
+            print(f"✅ Snapshot cargado: {sum(counts.values())} filas desde {SAMPLE_DATA_SNAPSHOT}")
+            return
+        
         # Crear power-ups de ejemplo
         power_ups_data = [
             {
@@ -115,9 +174,12 @@ async def create_sample_data():
 async def lifespan(app: FastAPI):
     # Código que se ejecuta al iniciar la aplicación
     await create_sample_data()
+    matchmaking_task = asyncio.create_task(matchmaking_service.run())
     yield
     # Código que se ejecuta al cerrar la aplicación
-    pass
+    matchmaking_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await matchmaking_task
 
 # Crear la aplicación FastAPI
 app = FastAPI(
@@ -134,6 +196,7 @@ app.include_router(players.router, prefix=API_PREFIX)
 app.include_router(tournaments.router, prefix=API_PREFIX)
 app.include_router(power_ups.router, prefix=API_PREFIX)
 app.include_router(auth.router, prefix=API_PREFIX)
+app.include_router(matchmaking.router, prefix=API_PREFIX)
 
 # Ruta raíz
 @app.get("/")
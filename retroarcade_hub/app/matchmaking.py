@@ -0,0 +1,286 @@
+"""
+Cola de matchmaking por habilidad para RetroArcade Hub
+
+Los jugadores en espera se agrupan por game_title y, dentro de cada juego,
+en buckets de rating. Buscar rival solo revisa los buckets vecinos dentro de
+la ventana del ticket, por lo que el coste no depende del tamaño de la cola.
+"""
+
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .config import (
+    MATCHMAKING_BUCKET_SIZE,
+    MATCHMAKING_MATCH_TTL_SECONDS,
+    MATCHMAKING_MAX_TICKETS_PER_TICK,
+    MATCHMAKING_MAX_WINDOW_BUCKETS,
+    MATCHMAKING_TICK_SECONDS,
+    MATCHMAKING_WINDOW_GROWTH_SECONDS,
+)
+
+
+def player_rating(level: int, experience_points: int) -> int:
+    """Calcular el rating de matchmaking a partir del nivel y la experiencia"""
+    return (level or 1) * 1000 + (experience_points or 0)
+
+
+@dataclass
+class Ticket:
+    """Jugador esperando rival en una cola"""
+    player_id: int
+    game_title: str
+    rating: int
+    bucket: int
+    enqueued_at: float
+
+
+@dataclass
+class Match:
+    """Pareja de jugadores emparejados"""
+    match_id: int
+    game_title: str
+    player_ids: Tuple[int, int]
+    rating_gap: int
+    created_at: float
+
+
+class MatchmakingQueue:
+    """Cola de espera de un game_title indexada por buckets de rating"""
+
+    def __init__(
+        self,
+        game_title: str,
+        bucket_size: int = MATCHMAKING_BUCKET_SIZE,
+        window_growth_seconds: float = MATCHMAKING_WINDOW_GROWTH_SECONDS,
+        max_window_buckets: int = MATCHMAKING_MAX_WINDOW_BUCKETS,
+    ):
+        self.game_title = game_title
+        self.bucket_size = bucket_size
+        self.window_growth_seconds = window_growth_seconds
+        self.max_window_buckets = max_window_buckets
+        # bucket -> tickets en orden de llegada
+        self.buckets: Dict[int, "OrderedDict[int, Ticket]"] = {}
+        # Todos los tickets; el frente es el próximo en buscar rival fuera de su bucket
+        self.tickets: "OrderedDict[int, Ticket]" = OrderedDict()
+        # Buckets con dos o más tickets (emparejables sin buscar en vecinos),
+        # en el orden en que se recorren por turnos
+        self.crowded: "OrderedDict[int, None]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.tickets)
+
+    def __contains__(self, player_id: int) -> bool:
+        return player_id in self.tickets
+
+    def enqueue(self, player_id: int, rating: int, now: Optional[float] = None) -> Ticket:
+        """Agregar un jugador a la cola"""
+        ticket = Ticket(
+            player_id=player_id,
+            game_title=self.game_title,
+            rating=rating,
+            bucket=rating // self.bucket_size,
+            enqueued_at=time.monotonic() if now is None else now,
+        )
+        self.tickets[player_id] = ticket
+        bucket = self.buckets.setdefault(ticket.bucket, OrderedDict())
+        bucket[player_id] = ticket
+        if len(bucket) >= 2:
+            self.crowded.setdefault(ticket.bucket)
+        return ticket
+
+    def remove(self, player_id: int) -> Optional[Ticket]:
+        """Quitar un jugador de la cola si está esperando"""
+        ticket = self.tickets.pop(player_id, None)
+        if ticket is None:
+            return None
+        bucket = self.buckets[ticket.bucket]
+        del bucket[player_id]
+        if len(bucket) < 2:
+            self.crowded.pop(ticket.bucket, None)
+        if not bucket:
+            del self.buckets[ticket.bucket]
+        return ticket
+
+    def window(self, ticket: Ticket, now: float) -> int:
+        """Distancia máxima en buckets que el ticket acepta según su espera"""
+        waited = max(0.0, now - ticket.enqueued_at)
+        return min(self.max_window_buckets, int(waited // self.window_growth_seconds))
+
+    def _find_opponent(self, ticket: Ticket, now: float) -> Optional[Ticket]:
+        """Buscar el rival más cercano en los buckets dentro de la ventana"""
+        for distance in range(self.window(ticket, now) + 1):
+            candidates = (ticket.bucket,) if distance == 0 else (
+                ticket.bucket - distance, ticket.bucket + distance
+            )
+            for bucket_id in candidates:
+                bucket = self.buckets.get(bucket_id)
+                if not bucket:
+                    continue
+                for player_id, other in bucket.items():
+                    if player_id != ticket.player_id:
+                        return other
+        return None
+
+    def _pair(self, match_ids: Iterator[int], ticket: Ticket, opponent: Ticket, now: float) -> Match:
+        """Sacar a ambos jugadores de la cola y registrar el emparejamiento"""
+        self.remove(ticket.player_id)
+        self.remove(opponent.player_id)
+        return Match(
+            match_id=next(match_ids),
+            game_title=self.game_title,
+            player_ids=(ticket.player_id, opponent.player_id),
+            rating_gap=abs(ticket.rating - opponent.rating),
+            created_at=now,
+        )
+
+    def tick(
+        self,
+        match_ids: Iterator[int],
+        now: Optional[float] = None,
+        max_tickets: int = MATCHMAKING_MAX_TICKETS_PER_TICK,
+    ) -> List[Match]:
+        """
+        Emparejar en lote a los jugadores en espera.
+
+        Primero se emparejan los tickets que comparten bucket (solo se visitan
+        buckets con dos o más tickets), con la mitad de max_tickets como
+        máximo y recorriendo los buckets por turnos entre rondas. El resto,
+        al menos la otra mitad, busca rival en buckets vecinos para los
+        tickets del frente de la cola; los que no encuentran rival pasan al
+        final, de modo que el trabajo por ronda está acotado sin que los
+        buckets llenos dejen sin revisar al resto.
+        """
+        now = time.monotonic() if now is None else now
+        matches: List[Match] = []
+        budget = max_tickets
+        same_bucket_budget = max_tickets // 2
+
+        # 1. Mismo bucket: cada ticket visitado produce un emparejamiento
+        for bucket_id in list(self.crowded):
+            if same_bucket_budget < 2:
+                break
+            bucket = self.buckets[bucket_id]
+            while len(bucket) >= 2 and same_bucket_budget >= 2:
+                tickets = iter(bucket.values())
+                ticket, opponent = next(tickets), next(tickets)
+                matches.append(self._pair(match_ids, ticket, opponent, now))
+                same_bucket_budget -= 2
+                budget -= 2
+            # Si quedó pendiente, la próxima ronda empieza por otro bucket
+            if bucket_id in self.crowded:
+                self.crowded.move_to_end(bucket_id)
+
+        # 2. Buckets vecinos dentro de la ventana de cada ticket
+        for _ in range(min(budget, len(self.tickets))):
+            if not self.tickets:
+                break
+            ticket = next(iter(self.tickets.values()))
+            opponent = self._find_opponent(ticket, now)
+            if opponent is None:
+                self.tickets.move_to_end(ticket.player_id)
+                continue
+            matches.append(self._pair(match_ids, ticket, opponent, now))
+        return matches
+
+
+class MatchmakingService:
+    """Colas de matchmaking por game_title y resultados de emparejamiento"""
+
+    def __init__(self, match_ttl_seconds: float = MATCHMAKING_MATCH_TTL_SECONDS):
+        self.queues: Dict[str, MatchmakingQueue] = {}
+        self.player_queues: Dict[int, str] = {}  # player_id -> game_title
+        # player_id -> último emparejamiento, en orden de creación (expiran por TTL)
+        self.matches: Dict[int, Match] = {}
+        self.match_ttl_seconds = match_ttl_seconds
+        self._match_ids = itertools.count(1)
+
+    def is_queued(self, player_id: int) -> bool:
+        return player_id in self.player_queues
+
+    def enqueue(
+        self, player_id: int, game_title: str, rating: int, now: Optional[float] = None
+    ) -> Ticket:
+        """Agregar un jugador a la cola de su juego"""
+        self.matches.pop(player_id, None)
+        queue = self.queues.get(game_title)
+        if queue is None:
+            queue = self.queues[game_title] = MatchmakingQueue(game_title)
+        self.player_queues[player_id] = game_title
+        return queue.enqueue(player_id, rating, now)
+
+    def dequeue(self, player_id: int) -> Optional[Ticket]:
+        """Sacar a un jugador de la cola en la que esté esperando"""
+        self.matches.pop(player_id, None)
+        game_title = self.player_queues.pop(player_id, None)
+        if game_title is None:
+            return None
+        queue = self.queues[game_title]
+        ticket = queue.remove(player_id)
+        if not queue:
+            del self.queues[game_title]
+        return ticket
+
+    def status(self, player_id: int, now: Optional[float] = None) -> Optional[dict]:
+        """Estado del jugador: esperando o emparejado"""
+        now = time.monotonic() if now is None else now
+        match = self.matches.get(player_id)
+        if match is not None:
+            return {
+                "player_id": player_id,
+                "game_title": match.game_title,
+                "status": "matched",
+                "match_id": match.match_id,
+                "opponent_id": next(p for p in match.player_ids if p != player_id),
+                "rating_gap": match.rating_gap,
+            }
+        game_title = self.player_queues.get(player_id)
+        if game_title is None:
+            return None
+        queue = self.queues[game_title]
+        ticket = queue.tickets[player_id]
+        return {
+            "player_id": player_id,
+            "game_title": game_title,
+            "status": "waiting",
+            "rating": ticket.rating,
+            "wait_seconds": round(max(0.0, now - ticket.enqueued_at), 3),
+            "search_window": queue.window(ticket, now) * queue.bucket_size,
+        }
+
+    def tick(self, now: Optional[float] = None) -> List[Match]:
+        """Ejecutar una ronda de emparejamiento en todas las colas"""
+        now = time.monotonic() if now is None else now
+        matches: List[Match] = []
+        for game_title, queue in list(self.queues.items()):
+            matches.extend(queue.tick(self._match_ids, now))
+            # Las colas vacías se descartan para no acumular game_title sin jugadores
+            if not queue:
+                del self.queues[game_title]
+        for match in matches:
+            for player_id in match.player_ids:
+                self.player_queues.pop(player_id, None)
+                self.matches[player_id] = match
+        self._expire_matches(now)
+        return matches
+
+    def _expire_matches(self, now: float):
+        """Olvidar emparejamientos más antiguos que el TTL"""
+        while self.matches:
+            player_id, match = next(iter(self.matches.items()))
+            if now - match.created_at < self.match_ttl_seconds:
+                break
+            del self.matches[player_id]
+
+    async def run(self, interval: float = MATCHMAKING_TICK_SECONDS):
+        """Bucle de emparejamiento periódico (se lanza en el lifespan de la app)"""
+        while True:
+            self.tick()
+            await asyncio.sleep(interval)
+
+
+# Instancia compartida por la aplicación
+matchmaking_service = MatchmakingService()
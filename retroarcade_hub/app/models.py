@@ -2,7 +2,7 @@
 Modelos SQLAlchemy para RetroArcade Hub
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -25,10 +25,14 @@ class Player(Base):
     # Relaciones
     tournament_participations = relationship("TournamentParticipation", back_populates="player")
     power_ups = relationship("PlayerPowerUp", back_populates="player")
+    purchases = relationship("Purchase", back_populates="player")
+    stats = relationship("PlayerStats", back_populates="player", uselist=False)
 
 class Tournament(Base):
     """Modelo para torneos"""
     __tablename__ = "tournaments"
+    # AUTOINCREMENT: los ids archivados no se reutilizan
+    __table_args__ = {"sqlite_autoincrement": True}
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
@@ -64,6 +68,10 @@ class PowerUp(Base):
 class PlayerPowerUp(Base):
     """Modelo para la relación entre jugadores y power-ups (inventario)"""
     __tablename__ = "player_power_ups"
+    __table_args__ = (
+        # Una fila por jugador y power-up: las compras hacen upsert sobre este índice
+        Index("ix_player_power_ups_player_power_up", "player_id", "power_up_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     player_id = Column(Integer, ForeignKey("players.id"))
@@ -78,9 +86,10 @@ class PlayerPowerUp(Base):
 class TournamentParticipation(Base):
     """Modelo para la participación de jugadores en torneos"""
     __tablename__ = "tournament_participations"
+    __table_args__ = {"sqlite_autoincrement": True}
     
     id = Column(Integer, primary_key=True, index=True)
-    tournament_id = Column(Integer, ForeignKey("tournaments.id"))
+    tournament_id = Column(Integer, ForeignKey("tournaments.id"), index=True)
     player_id = Column(Integer, ForeignKey("players.id"))
     score = Column(Integer, default=0)
     position = Column(Integer)
@@ -89,4 +98,73 @@ class TournamentParticipation(Base):
     
     # Relaciones
     tournament = relationship("Tournament", back_populates="participants")
-    player = relationship("Player", back_populates="tournament_participations")
\ No newline at end of file
+    player = relationship("Player", back_populates="tournament_participations")
+
+class Purchase(Base):
+    """Modelo para compras de power-ups en el marketplace"""
+    __tablename__ = "purchases"
+    __table_args__ = (
+        # Reintentos con la misma Idempotency-Key no vuelven a cobrar
+        Index("ix_purchases_player_idempotency_key", "player_id", "idempotency_key", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    player_id = Column(Integer, ForeignKey("players.id"), nullable=False)
+    idempotency_key = Column(String(64))
+    items = Column(String(1000))  # JSON string del carrito comprado
+    total_cost = Column(Integer, nullable=False)
+    coins = Column(Integer)  # Saldo tras la compra (se repite en los reintentos)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relaciones
+    player = relationship("Player", back_populates="purchases")
+
+class PlayerStats(Base):
+    """Modelo para estadísticas materializadas del jugador (perfil)"""
+    __tablename__ = "player_stats"
+    
+    player_id = Column(Integer, ForeignKey("players.id"), primary_key=True)
+    tournaments_played = Column(Integer, default=0, nullable=False)
+    best_position = Column(Integer)
+    total_score = Column(Integer, default=0, nullable=False)
+    power_ups_owned = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relaciones
+    player = relationship("Player", back_populates="stats")
+
+class ArchivedTournament(Base):
+    """Modelo para torneos completados movidos a la base de datos de archivo"""
+    __tablename__ = "tournaments"
+    __table_args__ = {"schema": "archive"}
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=False)
+    game_title = Column(String(100), nullable=False)
+    description = Column(String(500))
+    entry_fee = Column(Integer, default=0)
+    prize_pool = Column(Integer, default=0)
+    max_participants = Column(Integer, default=32)
+    start_date = Column(DateTime, nullable=False)
+    end_date = Column(DateTime, nullable=False)
+    status = Column(String(20), default="completed")
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relaciones
+    participants = relationship("ArchivedTournamentParticipation", back_populates="tournament")
+
+class ArchivedTournamentParticipation(Base):
+    """Modelo para participaciones de torneos archivados"""
+    __tablename__ = "tournament_participations"
+    __table_args__ = {"schema": "archive"}
+    
+    id = Column(Integer, primary_key=True, index=True)
+    tournament_id = Column(Integer, ForeignKey("archive.tournaments.id"), index=True)
+    player_id = Column(Integer, index=True)  # Sin FK: players vive en la base principal
+    score = Column(Integer, default=0)
+    position = Column(Integer)
+    active_power_ups = Column(String(200))
+    joined_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relaciones
+    tournament = relationship("ArchivedTournament", back_populates="participants")
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""
+Router para endpoints de matchmaking por habilidad
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from ..db import get_db
+from ..matchmaking import matchmaking_service, player_rating
+from ..models import Player
+from ..schemas import MatchmakingEnqueue, MatchmakingStatusResponse
+from .auth import get_current_player
+
+router = APIRouter(
+    prefix="/matchmaking",
+    tags=["matchmaking"],
+    responses={404: {"description": "No encontrado"}},
+)
+
+@router.post("/queue", response_model=MatchmakingStatusResponse, status_code=status.HTTP_201_CREATED)
+async def enqueue_player(
+    queue_data: MatchmakingEnqueue,
+    current_player=Depends(get_current_player),
+    db: Session = Depends(get_db)
+):
+    """
+    Entrar en la cola de matchmaking de un juego
+
+    - **player_id**: Jugador activo que busca rival
+    - **game_title**: Juego para el que se busca partida
+
+    Requiere autenticación como el propio jugador. El rating se calcula a
+    partir del nivel y la experiencia; la ventana de búsqueda se amplía
+    mientras el jugador espera.
+    """
+    if queue_data.player_id != current_player["id"]:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    
+    player = db.query(Player).filter(Player.id == queue_data.player_id).first()
+    if not player or not player.is_active:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    if matchmaking_service.is_queued(player.id):
+        raise HTTPException(status_code=400, detail="Player already in matchmaking queue")
+
+    matchmaking_service.enqueue(
+        player.id,
+        queue_data.game_title,
+        player_rating(player.level, player.experience_points),
+    )
+    return matchmaking_service.status(player.id)
+
+@router.get("/queue/{player_id}", response_model=MatchmakingStatusResponse)
+async def get_queue_status(player_id: int):
+    """Consultar si el jugador sigue esperando o ya tiene rival"""
+    queue_status = matchmaking_service.status(player_id)
+    if queue_status is None:
+        raise HTTPException(status_code=404, detail="Player not in matchmaking queue")
+    return queue_status
+
+@router.delete("/queue/{player_id}")
+async def dequeue_player(player_id: int, current_player=Depends(get_current_player)):
+    """Salir de la cola de matchmaking (solo el propio jugador autenticado)"""
+    if player_id != current_player["id"]:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    if matchmaking_service.status(player_id) is None:
+        raise HTTPException(status_code=404, detail="Player not in matchmaking queue")
+    matchmaking_service.dequeue(player_id)
+    return {"message": "Player removed from matchmaking queue"}
@@ -2,13 +2,16 @@
 Router para endpoints relacionados con jugadores
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from sqlalchemy import update
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from ..db import get_db
-from ..models import Player, PlayerPowerUp, PowerUp, TournamentParticipation
-from ..schemas import PlayerCreate, PlayerResponse
+from ..models import Player, PlayerPowerUp, PlayerStats, PowerUp, Purchase, Tournament, TournamentParticipation
+from ..schemas import PlayerCreate, PlayerProfileResponse, PlayerResponse, PurchaseCreate, PurchaseResponse
+from ..stats import increment_player_stats
 from .auth import get_current_player
 import json
 from datetime import datetime, timedelta
@@ -68,6 +71,30 @@ async def get_player(player_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Player not found")
     return player
 
+@router.get("/{player_id}/profile", response_model=PlayerProfileResponse)
+async def get_player_profile(player_id: int, db: Session = Depends(get_db)):
+    """
+    Obtener perfil completo del jugador con sus estadísticas
+    
+    Los totales (torneos jugados, mejor posición, puntuación total y
+    power-ups en inventario) se leen de player_stats en la misma consulta
+    por clave primaria.
+    """
+    row = db.query(Player, PlayerStats).outerjoin(
+        PlayerStats, PlayerStats.player_id == Player.id
+    ).filter(Player.id == player_id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Player not found")
+    
+    player, stats = row
+    profile = PlayerProfileResponse.model_validate(player)
+    if stats:
+        profile.tournaments_played = stats.tournaments_played
+        profile.best_position = stats.best_position
+        profile.total_score = stats.total_score
+        profile.power_ups_owned = stats.power_ups_owned
+    return profile
+
 @router.post("/{player_id}/apply-power-up")
 async def apply_power_up(
     player_id: int,
@@ -121,7 +148,8 @@ async def apply_power_up(
         raise HTTPException(status_code=400, detail="Player not registered in tournament")
     
     # Aplicar power-up
-    # 1. Consumir power-up del inventario
+    # 1. Consumir power-up del inventario (estadísticas antes del cambio)
+    increment_player_stats(db, player_id, power_ups_owned=-1)
     player_power_up.quantity -= 1
     if player_power_up.quantity == 0:
         db.delete(player_power_up)
@@ -170,4 +198,133 @@ async def get_player_inventory(
             "acquired_at": player_pu.acquired_at
         })
     
-    return result
\ No newline at end of file
+    return result
+
+def _replay_purchase(db: Session, player_id: int, idempotency_key: Optional[str], cart: list):
+    """
+    Respuesta original de una compra ya registrada con la misma clave.
+    
+    Devuelve None si la clave no se ha usado; 409 si se usó con otro carrito.
+    """
+    if idempotency_key is None:
+        return None
+    previous = db.query(Purchase).filter(
+        Purchase.player_id == player_id,
+        Purchase.idempotency_key == idempotency_key
+    ).first()
+    if previous is None:
+        return None
+    if json.loads(previous.items) != cart:
+        raise HTTPException(
+            status_code=409,
+            detail="Idempotency key already used with a different cart"
+        )
+    coins = previous.coins
+    if coins is None:
+        # Compras anteriores a la columna coins: saldo actual
+        coins = db.query(Player.coins).filter(Player.id == player_id).scalar()
+    return {
+        "purchase_id": previous.id,
+        "player_id": player_id,
+        "items": cart,
+        "total_cost": previous.total_cost,
+        "coins": coins,
+        "replayed": True
+    }
+
+@router.post("/{player_id}/purchases", response_model=PurchaseResponse, status_code=status.HTTP_201_CREATED)
+async def purchase_power_ups(
+    player_id: int,
+    purchase_data: PurchaseCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=64),
+    current_player=Depends(get_current_player),
+    db: Session = Depends(get_db)
+):
+    """
+    Comprar un carrito de power-ups en una sola transacción
+    
+    - **items**: Lista de power_up_id y quantity
+    - **Idempotency-Key**: Header opcional; reintentos con la misma clave
+      devuelven la respuesta original (incluido el saldo) sin volver a cobrar,
+      aunque el power-up ya no exista
+    
+    El cobro es un único UPDATE condicional (coins >= total) y el inventario
+    se actualiza con un upsert por lote, sin leer y reescribir cada fila.
+    """
+    if player_id != current_player["id"]:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    
+    # Agrupar líneas repetidas del carrito
+    quantities = {}
+    for item in purchase_data.items:
+        quantities[item.power_up_id] = quantities.get(item.power_up_id, 0) + item.quantity
+    cart = [{"power_up_id": pu_id, "quantity": qty} for pu_id, qty in sorted(quantities.items())]
+    
+    # Un reintento de una compra ya completada no depende de precios actuales
+    replay = _replay_purchase(db, player_id, idempotency_key, cart)
+    if replay is not None:
+        return replay
+    
+    # Precios de todo el carrito en una sola consulta
+    prices = dict(
+        db.query(PowerUp.id, PowerUp.price).filter(PowerUp.id.in_(quantities)).all()
+    )
+    missing = [pu_id for pu_id in quantities if pu_id not in prices]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Power-up {missing[0]} not found")
+    total_cost = sum(prices[pu_id] * qty for pu_id, qty in quantities.items())
+    
+    # 1. Cobro condicional: falla si no existe el jugador o no tiene saldo
+    coins = db.execute(
+        update(Player)
+        .where(Player.id == player_id, Player.coins >= total_cost)
+        .values(coins=Player.coins - total_cost)
+        .returning(Player.coins)
+    ).scalar_one_or_none()
+    
+    if coins is None:
+        db.rollback()
+        if not db.query(Player.id).filter(Player.id == player_id).first():
+            raise HTTPException(status_code=404, detail="Player not found")
+        raise HTTPException(status_code=400, detail="Insufficient coins")
+    
+    # 2. Registrar la compra con el saldo resultante; si la clave ya existe,
+    # otro reintento concurrente se confirmó antes y se deshace el cobro
+    purchase_id = db.execute(
+        insert(Purchase)
+        .values(
+            player_id=player_id,
+            idempotency_key=idempotency_key,
+            items=json.dumps(cart),
+            total_cost=total_cost,
+            coins=coins,
+            created_at=datetime.utcnow()
+        )
+        .on_conflict_do_nothing(index_elements=["player_id", "idempotency_key"])
+        .returning(Purchase.id)
+    ).scalar_one_or_none()
+    
+    if purchase_id is None:
+        db.rollback()
+        return _replay_purchase(db, player_id, idempotency_key, cart)
+    
+    # 3. Sumar al inventario con un único upsert (estadísticas antes del cambio)
+    increment_player_stats(db, player_id, power_ups_owned=sum(quantities.values()))
+    acquired_at = datetime.utcnow()
+    upsert = insert(PlayerPowerUp).values([
+        {"player_id": player_id, "acquired_at": acquired_at, **item} for item in cart
+    ])
+    db.execute(upsert.on_conflict_do_update(
+        index_elements=["player_id", "power_up_id"],
+        set_={"quantity": PlayerPowerUp.quantity + upsert.excluded.quantity}
+    ))
+    
+    db.commit()
+    
+    return {
+        "purchase_id": purchase_id,
+        "player_id": player_id,
+        "items": cart,
+        "total_cost": total_cost,
+        "coins": coins
+    }
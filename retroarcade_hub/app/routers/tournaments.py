@@ -3,11 +3,17 @@ Router para endpoints relacionados con torneos
 """
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from ..db import get_db
-from ..models import Tournament
+from ..models import (
+    ArchivedTournament,
+    ArchivedTournamentParticipation,
+    Tournament,
+    TournamentParticipation,
+)
 from ..schemas import TournamentResponse
 
 router = APIRouter(
@@ -16,10 +22,35 @@ router = APIRouter(
     responses={404: {"description": "No encontrado"}},
 )
 
+# Torneos en caliente y su copia en la base de archivo
+HOT = (Tournament, TournamentParticipation)
+ARCHIVE = (ArchivedTournament, ArchivedTournamentParticipation)
+
+def _tournaments_with_counts(db: Session, models, *filters) -> List[TournamentResponse]:
+    """Consultar torneos con su conteo de participantes en una sola consulta"""
+    tournament_model, participation_model = models
+    # Conteo correlacionado: solo recorre el índice de tournament_id de cada torneo devuelto
+    participants_count = select(func.count()).where(
+        participation_model.tournament_id == tournament_model.id
+    ).correlate(tournament_model).scalar_subquery()
+    
+    rows = db.query(tournament_model, participants_count).filter(
+        *filters
+    ).order_by(tournament_model.id).all()
+    
+    result = []
+    for tournament, participants in rows:
+        tournament_dict = tournament.__dict__.copy()
+        tournament_dict["current_participants"] = participants
+        tournament_dict["archived"] = models is ARCHIVE
+        result.append(TournamentResponse(**tournament_dict))
+    return result
+
 @router.get("", response_model=List[TournamentResponse])
 async def list_tournaments(
     game_title: Optional[str] = None,
     status: str = "active",
+    include_archived: bool = False,
     db: Session = Depends(get_db)
 ):
     """
@@ -27,22 +58,25 @@ async def list_tournaments(
     
     - **game_title**: Filtrar por juego específico
     - **status**: upcoming, active, completed
+    - **include_archived**: Incluir torneos completados movidos al archivo
     """
-    query = db.query(Tournament)
-    
-    if game_title:
-        query = query.filter(Tournament.game_title.ilike(f"%{game_title}%"))
-    
-    if status:
-        query = query.filter(Tournament.status == status)
-    
-    tournaments = query.all()
-    
-    # Agregar conteo de participantes actuales
     result = []
-    for tournament in tournaments:
-        tournament_dict = tournament.__dict__.copy()
-        tournament_dict["current_participants"] = len(tournament.participants)
-        result.append(TournamentResponse(**tournament_dict))
+    for models in (HOT, ARCHIVE) if include_archived else (HOT,):
+        tournament_model = models[0]
+        filters = []
+        if game_title:
+            filters.append(tournament_model.game_title.ilike(f"%{game_title}%"))
+        if status:
+            filters.append(tournament_model.status == status)
+        result.extend(_tournaments_with_counts(db, models, *filters))
     
-    return result
\ No newline at end of file
+    return result
+
+@router.get("/{tournament_id}", response_model=TournamentResponse)
+async def get_tournament(tournament_id: int, db: Session = Depends(get_db)):
+    """Obtener torneo por ID; si no está en caliente se busca en el archivo"""
+    for models in (HOT, ARCHIVE):
+        found = _tournaments_with_counts(db, models, models[0].id == tournament_id)
+        if found:
+            return found[0]
+    raise HTTPException(status_code=404, detail="Tournament not found")
@@ -28,6 +28,13 @@ class PlayerResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class PlayerProfileResponse(PlayerResponse):
+    """Esquema para el perfil completo de jugador con estadísticas"""
+    tournaments_played: int = 0
+    best_position: Optional[int] = None
+    total_score: int = 0
+    power_ups_owned: int = 0
+
 # Esquemas para Torneos
 class TournamentResponse(BaseModel):
     """Esquema para respuesta de torneo"""
@@ -42,6 +49,7 @@ class TournamentResponse(BaseModel):
     start_date: datetime
     end_date: datetime
     status: str
+    archived: bool = False
     
     class Config:
         from_attributes = True
@@ -64,4 +72,41 @@ class PowerUpResponse(BaseModel):
     price: int
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Esquemas para Compras
+class CartItem(BaseModel):
+    """Esquema para un power-up dentro del carrito"""
+    power_up_id: int
+    quantity: int = Field(1, ge=1, le=99)
+
+class PurchaseCreate(BaseModel):
+    """Esquema para comprar un carrito de power-ups"""
+    items: List[CartItem] = Field(..., min_length=1, max_length=50)
+
+class PurchaseResponse(BaseModel):
+    """Esquema para respuesta de compra"""
+    purchase_id: int
+    player_id: int
+    items: List[CartItem]
+    total_cost: int
+    coins: int
+    replayed: bool = False
+
+# Esquemas para Matchmaking
+class MatchmakingEnqueue(BaseModel):
+    """Esquema para entrar en la cola de matchmaking"""
+    player_id: int
+    game_title: str = Field(..., min_length=1, max_length=100)
+
+class MatchmakingStatusResponse(BaseModel):
+    """Esquema para el estado de un jugador en matchmaking"""
+    player_id: int
+    game_title: str
+    status: str  # waiting, matched
+    rating: Optional[int] = None
+    wait_seconds: Optional[float] = None
+    search_window: Optional[int] = None
+    match_id: Optional[int] = None
+    opponent_id: Optional[int] = None
+    rating_gap: Optional[int] = None
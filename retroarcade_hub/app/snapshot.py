@@ -0,0 +1,320 @@
+"""
+Exportación e importación de snapshots de la base de datos
+
+Un snapshot es un fichero NDJSON comprimido con gzip. Cada tabla empieza con
+una línea de cabecera {"table": ..., "columns": [...]} seguida de una línea
+por fila (lista JSON con los valores tal y como los guarda SQLite), por lo
+que exportar e importar trabajan en streaming con memoria constante:
+
+    python -m retroarcade_hub.app.snapshot export snapshot.ndjson.gz
+    python -m retroarcade_hub.app.snapshot import snapshot.ndjson.gz
+    python -m retroarcade_hub.app.snapshot generate --players 1000000 seed.ndjson.gz
+
+La importación reemplaza el contenido de todas las tablas del snapshot,
+incluidas las compras y el archivo histórico: las que no aparezcan en el
+fichero (p. ej. en un snapshot generado) quedan vacías, de modo que no
+sobrevive historial ni claves de idempotencia de jugadores anteriores que
+reutilicen el mismo id. Borra los índices, carga por lotes con executemany y
+reconstruye índices y estadísticas al final, todo en una sola transacción.
+"""
+
+import argparse
+import gzip
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Iterator, List
+
+from sqlalchemy import delete
+
+from .archive import _reuses_ids
+from .db import engine
+from .models import Base
+from .stats import rebuild_player_stats
+
+SNAPSHOT_FORMAT = "retroarcade-snapshot"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_BATCH_SIZE = 10_000
+SNAPSHOT_COMPRESSLEVEL = 6  # el 9 por defecto de gzip apenas reduce más y es mucho más lento
+
+# Orden de carga: las tablas referenciadas van primero
+SNAPSHOT_TABLES = [
+    "players",
+    "tournaments",
+    "power_ups",
+    "player_power_ups",
+    "tournament_participations",
+    "purchases",
+    "archive.tournaments",
+    "archive.tournament_participations",
+]
+
+# Tablas AUTOINCREMENT y su copia archivada: los ids de ambas no se reutilizan
+SNAPSHOT_SEQUENCES = {
+    "tournaments": "archive.tournaments",
+    "tournament_participations": "archive.tournament_participations",
+}
+
+# Formato con el que SQLAlchemy guarda DateTime en SQLite
+SQLITE_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+_encoder = json.JSONEncoder(separators=(",", ":"))
+_decoder = json.JSONDecoder()
+
+
+def _dump(line) -> str:
+    return _encoder.encode(line) + "\n"
+
+
+def _header() -> dict:
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "created_at": datetime.utcnow().isoformat(),
+    }
+
+
+def export_snapshot(path: str, bind=engine) -> dict:
+    """
+    Volcar las tablas del snapshot a un fichero NDJSON comprimido.
+
+    Todas las tablas se leen dentro de una única transacción de lectura, así
+    que el snapshot es una copia coherente aunque otros procesos escriban
+    mientras tanto (en modo rollback journal esas escrituras esperan al final
+    de la exportación; en WAL continúan sin afectar a la copia).
+    """
+    counts = {}
+    with gzip.open(path, "wt", compresslevel=SNAPSHOT_COMPRESSLEVEL, encoding="utf-8") as out, \
+            bind.connect() as connection:
+        out.write(_dump(_header()))
+        # Cursor DBAPI: valores crudos de SQLite leídos por lotes. pysqlite no
+        # abre transacción para SELECT, así que se abre a mano
+        cursor = connection.connection.cursor()
+        cursor.execute("BEGIN")
+        try:
+            for name in SNAPSHOT_TABLES:
+                columns = [column.name for column in Base.metadata.tables[name].columns]
+                out.write(_dump({"table": name, "columns": columns}))
+                cursor.execute(f"SELECT {', '.join(columns)} FROM {name} ORDER BY id")
+                counts[name] = 0
+                while True:
+                    rows = cursor.fetchmany(SNAPSHOT_BATCH_SIZE)
+                    if not rows:
+                        break
+                    out.write("".join(map(_dump, rows)))
+                    counts[name] += len(rows)
+        finally:
+            cursor.execute("ROLLBACK")  # Solo lectura: no hay nada que confirmar
+            cursor.close()
+    return counts
+
+
+def _read_snapshot(path: str) -> Iterator:
+    """Leer líneas del snapshot validando la cabecera"""
+    with gzip.open(path, "rt", encoding="utf-8") as snapshot:
+        header = _decoder.decode(next(snapshot))
+        if header.get("format") != SNAPSHOT_FORMAT or header.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot file: {path}")
+        yield from map(_decoder.decode, snapshot)
+
+
+def _advance_sequence(connection, name: str, archived_name: str) -> None:
+    """
+    Llevar el contador AUTOINCREMENT (sqlite_sequence) por encima de los ids
+    en caliente y archivados.
+
+    El snapshot no incluye sqlite_sequence: sin esto, una base restaurada
+    desde cero volvería a asignar ids que ya están en archive.*.
+    """
+    if _reuses_ids(connection, Base.metadata.tables[name]):
+        return  # Tabla sin AUTOINCREMENT: el archivado ya evita reutilizar ids
+    highest = connection.exec_driver_sql(
+        f"SELECT max(id) FROM (SELECT id FROM {name} UNION ALL SELECT id FROM {archived_name})"
+    ).scalar()
+    if highest is None:
+        return
+    updated = connection.exec_driver_sql(
+        "UPDATE main.sqlite_sequence SET seq = max(seq, ?) WHERE name = ?", (highest, name)
+    )
+    if updated.rowcount == 0:
+        connection.exec_driver_sql(
+            "INSERT INTO main.sqlite_sequence (name, seq) VALUES (?, ?)", (name, highest)
+        )
+
+
+def import_snapshot(path: str, bind=engine) -> dict:
+    """
+    Reemplazar las tablas del snapshot con el contenido del fichero.
+
+    Los índices se borran antes de cargar y se reconstruyen al final, y los
+    contadores AUTOINCREMENT se ajustan a los ids cargados; si el fichero no
+    es válido la transacción se revierte completa.
+    """
+    tables = [Base.metadata.tables[name] for name in SNAPSHOT_TABLES]
+    indexes = [index for table in tables for index in table.indexes]
+    counts = {}
+
+    with bind.begin() as connection:
+        # El primer DELETE abre la transacción; así el borrado de índices
+        # también se revierte si la carga falla
+        for table in reversed(tables):
+            connection.execute(delete(table))
+        for index in indexes:
+            index.drop(connection, checkfirst=True)
+
+        sql, name, batch = None, None, []
+        for line in _read_snapshot(path):
+            if isinstance(line, list):
+                batch.append(tuple(line))
+                if len(batch) >= SNAPSHOT_BATCH_SIZE:
+                    connection.exec_driver_sql(sql, batch)
+                    counts[name] += len(batch)
+                    batch = []
+                continue
+
+            # Cabecera de una nueva tabla
+            if batch:
+                connection.exec_driver_sql(sql, batch)
+                counts[name] += len(batch)
+                batch = []
+            name, columns = line["table"], line["columns"]
+            if name not in SNAPSHOT_TABLES:
+                raise ValueError(f"Unknown table in snapshot: {name}")
+            unknown = set(columns) - set(Base.metadata.tables[name].columns.keys())
+            if unknown:
+                raise ValueError(f"Unknown columns for {name}: {sorted(unknown)}")
+            sql = (
+                f"INSERT INTO {name} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})"
+            )
+            counts[name] = 0
+        if batch:
+            connection.exec_driver_sql(sql, batch)
+            counts[name] += len(batch)
+
+        for name, archived_name in SNAPSHOT_SEQUENCES.items():
+            _advance_sequence(connection, name, archived_name)
+        for index in indexes:
+            index.create(connection)
+        rebuild_player_stats(connection)
+
+    return counts
+
+
+def generate_snapshot(
+    path: str,
+    players: int,
+    tournaments: int = 0,
+    power_ups: int = 20,
+    participations_per_player: int = 5,
+    power_ups_per_player: int = 2,
+    seed: int = 42,
+) -> dict:
+    """
+    Generar un snapshot sintético para pruebas de carga y benchmarks.
+
+    Las filas se escriben según se generan, así que el tamaño del dataset no
+    está limitado por la memoria disponible.
+    """
+    rng = random.Random(seed)
+    tournaments = tournaments or max(1, players // 100)
+    participations_per_player = min(participations_per_player, tournaments)
+    power_ups_per_player = min(power_ups_per_player, power_ups)
+    now = datetime.utcnow()
+    stamp = now.strftime(SQLITE_DATETIME_FORMAT)
+    games = ["Pac-Man", "Street Fighter II", "Tetris", "Galaga", "Donkey Kong", "Space Invaders"]
+    effects = ["speed_boost", "shield", "damage_up"]
+    rarities = ["common", "rare", "epic", "legendary"]
+    counts = {}
+
+    def table(name: str, columns: List[str], rows) -> None:
+        out.write(_dump({"table": name, "columns": columns}))
+        counts[name] = 0
+        for row in rows:
+            out.write(_dump(row))
+            counts[name] += 1
+
+    def player_rows():
+        for i in range(1, players + 1):
+            yield [i, f"player_{i}", f"player_{i}@retro.com",
+                   "https://retro.com/avatars/default.png", rng.randint(0, 5000),
+                   rng.randint(1, 50), rng.randint(0, 999), stamp, 1]
+
+    def tournament_rows():
+        for i in range(1, tournaments + 1):
+            start = now + timedelta(days=rng.randint(-365, 30))
+            end = start + timedelta(days=rng.randint(1, 7))
+            status = "completed" if end < now else "active" if start < now else "upcoming"
+            yield [i, f"Tournament {i}", games[i % len(games)], "Torneo generado",
+                   rng.choice([0, 25, 50, 100]), rng.choice([1000, 5000, 10000]), 64,
+                   start.strftime(SQLITE_DATETIME_FORMAT),
+                   end.strftime(SQLITE_DATETIME_FORMAT), status, stamp]
+
+    def power_up_rows():
+        for i in range(1, power_ups + 1):
+            yield [i, f"Power-up {i}", "Power-up generado", effects[i % len(effects)],
+                   round(rng.uniform(1.0, 3.0), 2), rng.choice([15, 20, 30]),
+                   rarities[i % len(rarities)], rng.choice([100, 250, 500])]
+
+    def inventory_rows():
+        row_id = 0
+        for player_id in range(1, players + 1):
+            for power_up_id in rng.sample(range(1, power_ups + 1), power_ups_per_player):
+                row_id += 1
+                yield [row_id, player_id, power_up_id, rng.randint(1, 5), stamp]
+
+    def participation_rows():
+        row_id = 0
+        for player_id in range(1, players + 1):
+            for tournament_id in rng.sample(range(1, tournaments + 1), participations_per_player):
+                row_id += 1
+                yield [row_id, tournament_id, player_id, rng.randint(0, 100000),
+                       rng.randint(1, 64), None, stamp]
+
+    with gzip.open(path, "wt", compresslevel=SNAPSHOT_COMPRESSLEVEL, encoding="utf-8") as out:
+        out.write(_dump(_header()))
+        table("players", ["id", "username", "email", "avatar_url", "coins", "level",
+                          "experience_points", "created_at", "is_active"], player_rows())
+        table("tournaments", ["id", "name", "game_title", "description", "entry_fee",
+                              "prize_pool", "max_participants", "start_date", "end_date",
+                              "status", "created_at"], tournament_rows())
+        table("power_ups", ["id", "name", "description", "effect_type", "effect_value",
+                            "duration_minutes", "rarity", "price"], power_up_rows())
+        table("player_power_ups", ["id", "player_id", "power_up_id", "quantity",
+                                   "acquired_at"], inventory_rows())
+        table("tournament_participations", ["id", "tournament_id", "player_id", "score",
+                                            "position", "active_power_ups", "joined_at"],
+              participation_rows())
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snapshots de la base de datos RetroArcade Hub")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("export", help="Exportar la base de datos").add_argument("path")
+    subparsers.add_parser("import", help="Reemplazar tablas con un snapshot").add_argument("path")
+    generate = subparsers.add_parser("generate", help="Generar un snapshot sintético")
+    generate.add_argument("path")
+    generate.add_argument("--players", type=int, default=100_000)
+    generate.add_argument("--tournaments", type=int, default=0)
+    generate.add_argument("--power-ups", type=int, default=20)
+    generate.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    if args.command == "export":
+        counts = export_snapshot(args.path)
+    elif args.command == "import":
+        counts = import_snapshot(args.path)
+    else:
+        counts = generate_snapshot(
+            args.path, args.players, args.tournaments, args.power_ups, seed=args.seed
+        )
+    elapsed = time.perf_counter() - started
+
+    for name, total in counts.items():
+        print(f"  {name}: {total} filas")
+    print(f"✅ {args.command} completado en {elapsed:.2f} s")
@@ -0,0 +1,187 @@
+"""
+Estadísticas materializadas de jugadores (tabla player_stats)
+
+Los totales del perfil se mantienen de forma incremental en la misma
+transacción que modifica participaciones o inventario, y cubren también las
+participaciones archivadas. El comando rebuild los recalcula por completo
+con SQL sobre conjuntos:
+
+    python -m retroarcade_hub.app.stats rebuild
+"""
+
+import argparse
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import delete, event, func, inspect, literal, select, union_all, update
+
+from .db import engine
+from .models import (
+    ArchivedTournamentParticipation,
+    Base,
+    Player,
+    PlayerPowerUp,
+    PlayerStats,
+    TournamentParticipation,
+)
+
+
+def increment_player_stats(
+    connection,
+    player_id: int,
+    tournaments_played: int = 0,
+    total_score: int = 0,
+    power_ups_owned: int = 0,
+    best_position: Optional[int] = None,
+):
+    """
+    Sumar deltas a las estadísticas del jugador con un único UPDATE.
+
+    Acepta una Session o una Connection; best_position conserva el mínimo.
+    Debe llamarse antes de que el cambio sea visible en las tablas: si el
+    jugador aún no tiene fila, se reconstruye desde su historial y después se
+    aplica el delta, nunca se crea una fila solo con el delta.
+    """
+    stmt = (
+        update(PlayerStats)
+        .where(PlayerStats.player_id == player_id)
+        .values(
+            tournaments_played=PlayerStats.tournaments_played + tournaments_played,
+            total_score=PlayerStats.total_score + total_score,
+            power_ups_owned=PlayerStats.power_ups_owned + power_ups_owned,
+            best_position=func.min(
+                func.coalesce(PlayerStats.best_position, best_position),
+                func.coalesce(best_position, PlayerStats.best_position),
+            ),
+            updated_at=datetime.utcnow(),
+        )
+    )
+    if connection.execute(stmt).rowcount == 0:
+        rebuild_player_stats(connection, player_ids=[player_id])
+        connection.execute(stmt)
+
+
+def _player_history(player_ids: Optional[List[int]] = None):
+    """Participaciones en caliente y archivadas (opcionalmente de unos jugadores)"""
+    hot = select(
+        TournamentParticipation.player_id,
+        TournamentParticipation.position,
+        TournamentParticipation.score,
+    )
+    archived = select(
+        ArchivedTournamentParticipation.player_id,
+        ArchivedTournamentParticipation.position,
+        ArchivedTournamentParticipation.score,
+    )
+    if player_ids is not None:
+        hot = hot.where(TournamentParticipation.player_id.in_(player_ids))
+        archived = archived.where(ArchivedTournamentParticipation.player_id.in_(player_ids))
+    return union_all(hot, archived).subquery()
+
+
+@event.listens_for(TournamentParticipation, "before_insert")
+def _participation_inserted(mapper, connection, target):
+    """Contar la nueva participación en las estadísticas del jugador"""
+    increment_player_stats(
+        connection,
+        target.player_id,
+        tournaments_played=1,
+        total_score=target.score or 0,
+        best_position=target.position,
+    )
+
+
+@event.listens_for(TournamentParticipation, "before_update")
+def _participation_updated(mapper, connection, target):
+    """Aplicar cambios de puntuación de una participación"""
+    state = inspect(target)
+    if not (state.attrs.score.history.has_changes()
+            or state.attrs.position.history.has_changes()):
+        return
+    # La puntuación anterior se lee en el mismo UPDATE antes de sobrescribir la fila
+    old_score = (
+        select(TournamentParticipation.score)
+        .where(TournamentParticipation.id == target.id)
+        .scalar_subquery()
+    )
+    increment_player_stats(
+        connection,
+        target.player_id,
+        total_score=(target.score or 0) - func.coalesce(old_score, 0),
+    )
+
+
+@event.listens_for(TournamentParticipation, "after_update")
+def _participation_position_updated(mapper, connection, target):
+    """Recalcular la mejor posición cuando cambia una posición (puede empeorar)"""
+    if not inspect(target).attrs.position.history.has_changes():
+        return
+    history = _player_history([target.player_id])
+    connection.execute(
+        update(PlayerStats)
+        .where(PlayerStats.player_id == target.player_id)
+        .values(best_position=select(func.min(history.c.position)).scalar_subquery())
+    )
+
+
+def rebuild_player_stats(connection, player_ids: Optional[List[int]] = None) -> int:
+    """
+    Recalcular player_stats desde cero con INSERT ... SELECT agregados.
+
+    Con player_ids solo se recalculan esos jugadores.
+    """
+    history = _player_history(player_ids)
+    participations = (
+        select(
+            history.c.player_id,
+            func.count().label("played"),
+            func.min(history.c.position).label("best"),
+            func.sum(history.c.score).label("score"),
+        )
+        .group_by(history.c.player_id)
+        .subquery()
+    )
+    inventory = select(
+        PlayerPowerUp.player_id,
+        func.sum(PlayerPowerUp.quantity).label("owned"),
+    ).group_by(PlayerPowerUp.player_id)
+    if player_ids is not None:
+        inventory = inventory.where(PlayerPowerUp.player_id.in_(player_ids))
+    inventory = inventory.subquery()
+    rows = (
+        select(
+            Player.id,
+            func.coalesce(participations.c.played, 0),
+            participations.c.best,
+            func.coalesce(participations.c.score, 0),
+            func.coalesce(inventory.c.owned, 0),
+            literal(datetime.utcnow(), PlayerStats.updated_at.type),
+        )
+        .outerjoin(participations, participations.c.player_id == Player.id)
+        .outerjoin(inventory, inventory.c.player_id == Player.id)
+    )
+    stale = delete(PlayerStats)
+    if player_ids is not None:
+        rows = rows.where(Player.id.in_(player_ids))
+        stale = stale.where(PlayerStats.player_id.in_(player_ids))
+
+    connection.execute(stale)
+    result = connection.execute(
+        PlayerStats.__table__.insert().from_select(
+            ["player_id", "tournaments_played", "best_position",
+             "total_score", "power_ups_owned", "updated_at"],
+            rows,
+        )
+    )
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estadísticas materializadas de jugadores")
+    parser.add_argument("command", choices=["rebuild"])
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        rebuilt = rebuild_player_stats(connection)
+    print(f"✅ Estadísticas recalculadas para {rebuilt} jugadores")
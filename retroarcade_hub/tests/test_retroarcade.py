@@ -2,17 +2,72 @@
 Tests para la API RetroArcade Hub
 """
 
+import gzip
+import json
 import pytest
+import sqlite3
 import uuid
+from datetime import datetime, timedelta
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, inspect, select
+from sqlalchemy.orm import Session, sessionmaker
 
-from retroarcade_hub.app.main import app
+from retroarcade_hub.app.archive import archive_completed_tournaments
+from retroarcade_hub.app.db import SessionLocal, attach_archive, engine, get_db
+from retroarcade_hub.app.main import app, merge_duplicate_inventory
+from retroarcade_hub.app.models import (
+    ArchivedTournament, Base, PlayerPowerUp, PlayerStats, PowerUp, Tournament, TournamentParticipation
+)
+from retroarcade_hub.app.routers.auth import get_current_player
+from retroarcade_hub.app import snapshot
+from retroarcade_hub.app.snapshot import export_snapshot, generate_snapshot, import_snapshot
+from retroarcade_hub.app.stats import rebuild_player_stats
+from retroarcade_hub.app.matchmaking import MatchmakingQueue, MatchmakingService, matchmaking_service
+
+def create_temp_engine(directory):
+    """Motor sobre una base temporal con su propio fichero de archivo adjunto"""
+    directory.mkdir(parents=True, exist_ok=True)
+    temp_engine = create_engine(
+        f"sqlite:///{directory / 'retroarcade.db'}",
+        connect_args={"check_same_thread": False}
+    )
+    attach_archive(temp_engine, str(directory / "retroarcade_archive.db"))
+    Base.metadata.create_all(bind=temp_engine)
+    return temp_engine
 
 class TestRetroArcadeAPI:
     
+    @pytest.fixture
+    def temp_db(self, tmp_path):
+        """Base temporal (principal + archivo) que usan los endpoints vía get_db"""
+        temp_engine = create_temp_engine(tmp_path / "db")
+        TempSession = sessionmaker(autocommit=False, autoflush=False, bind=temp_engine)
+        
+        def get_temp_db():
+            db = TempSession()
+            try:
+                yield db
+            finally:
+                db.close()
+        
+        app.dependency_overrides[get_db] = get_temp_db
+        yield temp_engine
+        app.dependency_overrides.pop(get_db, None)
+        temp_engine.dispose()
+    
     @pytest.fixture
     def client(self):
-        return TestClient(app)
+        # El contexto ejecuta el lifespan (datos de ejemplo y matchmaking)
+        with TestClient(app) as client:
+            yield client
+    
+    @pytest.fixture
+    def authenticated_player(self, client, sample_player_data):
+        """Jugador recién creado que actúa como usuario autenticado"""
+        player = client.post("/api/v1/players", json=sample_player_data).json()
+        app.dependency_overrides[get_current_player] = lambda: player
+        yield player
+        app.dependency_overrides.pop(get_current_player, None)
     
     @pytest.fixture
     def sample_player_data(self):
@@ -107,4 +162,507 @@ class TestRetroArcadeAPI:
             json=power_up_data,
             headers={"Authorization": "Bearer fake-token"}
         )
-        assert response.status_code in [400, 404]
\ No newline at end of file
+        assert response.status_code in [400, 404]
+    
+    # TESTS PARA COMPRAS DE POWER-UPS
+    def test_purchase_power_ups_success(self, client, authenticated_player):
+        """Test exitoso: Comprar un carrito debe cobrar una vez y sumar inventario"""
+        player_id = authenticated_player["id"]
+        power_ups = {pu["id"]: pu for pu in client.get("/api/v1/power-ups").json()}
+        first, second = sorted(power_ups)[:2]
+        cart = {"items": [
+            {"power_up_id": first, "quantity": 2},
+            {"power_up_id": second, "quantity": 1},
+            {"power_up_id": first, "quantity": 1}
+        ]}
+        
+        response = client.post(f"/api/v1/players/{player_id}/purchases", json=cart,
+                               headers={"Idempotency-Key": "cart-1"})
+        assert response.status_code == 201
+        purchase = response.json()
+        expected_cost = power_ups[first]["price"] * 3 + power_ups[second]["price"]
+        assert purchase["total_cost"] == expected_cost
+        assert purchase["coins"] == 1000 - expected_cost
+        
+        # Un reintento con la misma clave no vuelve a cobrar
+        retry = client.post(f"/api/v1/players/{player_id}/purchases", json=cart,
+                            headers={"Idempotency-Key": "cart-1"})
+        assert retry.status_code == 201
+        assert retry.json()["replayed"] is True
+        assert retry.json()["purchase_id"] == purchase["purchase_id"]
+        assert retry.json()["coins"] == 1000 - expected_cost
+        
+        # Comprar de nuevo sin clave suma cantidades a la misma fila
+        client.post(f"/api/v1/players/{player_id}/purchases",
+                    json={"items": [{"power_up_id": first, "quantity": 1}]})
+        inventory = client.get(f"/api/v1/players/{player_id}/inventory").json()
+        quantities = {item["power_up"]["id"]: item["quantity"] for item in inventory}
+        assert quantities == {first: 4, second: 1}
+        
+        # El reintento repite la respuesta original aunque el saldo haya cambiado
+        retry = client.post(f"/api/v1/players/{player_id}/purchases", json=cart,
+                            headers={"Idempotency-Key": "cart-1"})
+        assert retry.json()["coins"] == 1000 - expected_cost
+        assert client.get(f"/api/v1/players/{player_id}").json()["coins"] < 1000 - expected_cost
+    
+    def test_purchase_replay_after_power_up_removed(self, temp_db, client, authenticated_player):
+        """Test: Reintentar una compra completada no depende de que el power-up siga existiendo"""
+        player_id = authenticated_player["id"]
+        with temp_db.begin() as connection:
+            power_up_id = connection.execute(PowerUp.__table__.insert().values(
+                name="Retro Ghost", description="Temporal", effect_type="shield",
+                effect_value=1.0, duration_minutes=10, rarity="common", price=150
+            )).inserted_primary_key[0]
+        cart = {"items": [{"power_up_id": power_up_id, "quantity": 2}]}
+        purchase = client.post(f"/api/v1/players/{player_id}/purchases", json=cart,
+                               headers={"Idempotency-Key": "ghost-1"}).json()
+        assert purchase["coins"] == 700
+        
+        with temp_db.begin() as connection:
+            connection.execute(PowerUp.__table__.delete().where(PowerUp.id == power_up_id))
+        retry = client.post(f"/api/v1/players/{player_id}/purchases", json=cart,
+                            headers={"Idempotency-Key": "ghost-1"})
+        assert retry.status_code == 201
+        assert retry.json() == {**purchase, "replayed": True}
+        
+        # Sin la clave ya no se puede comprar un power-up inexistente
+        assert client.post(f"/api/v1/players/{player_id}/purchases", json=cart).status_code == 404
+    
+    def test_purchase_power_ups_insufficient_coins_fails(self, client, authenticated_player):
+        """Test de fallo: Sin saldo suficiente no se cobra ni se agrega inventario"""
+        player_id = authenticated_player["id"]
+        power_up_id = client.get("/api/v1/power-ups").json()[0]["id"]
+        
+        response = client.post(f"/api/v1/players/{player_id}/purchases",
+                               json={"items": [{"power_up_id": power_up_id, "quantity": 99}]})
+        assert response.status_code == 400
+        assert client.get(f"/api/v1/players/{player_id}").json()["coins"] == 1000
+        assert client.get(f"/api/v1/players/{player_id}/inventory").json() == []
+    
+    def test_merge_duplicate_inventory_before_unique_index(self, client, authenticated_player):
+        """Test: Bases antiguas con inventario duplicado se fusionan antes del índice único"""
+        player_id = authenticated_player["id"]
+        power_up_ids = sorted(pu["id"] for pu in client.get("/api/v1/power-ups").json())[:2]
+        unique_index = next(
+            index for index in PlayerPowerUp.__table__.indexes
+            if index.name == "ix_player_power_ups_player_power_up"
+        )
+        
+        unique_index.drop(bind=engine)
+        try:
+            with engine.begin() as connection:
+                connection.execute(PlayerPowerUp.__table__.insert(), [
+                    {"player_id": player_id, "power_up_id": power_up_ids[0], "quantity": 2},
+                    {"player_id": player_id, "power_up_id": power_up_ids[0], "quantity": 3},
+                    {"player_id": player_id, "power_up_id": power_up_ids[1], "quantity": 1},
+                ])
+                merge_duplicate_inventory(connection)
+        finally:
+            unique_index.create(bind=engine)
+        
+        inventory = client.get(f"/api/v1/players/{player_id}/inventory").json()
+        assert sorted((item["power_up"]["id"], item["quantity"]) for item in inventory) == [
+            (power_up_ids[0], 5), (power_up_ids[1], 1)
+        ]
+    
+    # TESTS PARA PERFIL CON ESTADÍSTICAS
+    def test_player_profile_stats_incremental_and_rebuild(self, client, authenticated_player):
+        """Test: El perfil debe reflejar participaciones e inventario sin recalcular"""
+        player_id = authenticated_player["id"]
+        power_up_id = client.get("/api/v1/power-ups").json()[0]["id"]
+        client.post(f"/api/v1/players/{player_id}/purchases",
+                    json={"items": [{"power_up_id": power_up_id, "quantity": 2}]})
+        
+        db = SessionLocal()
+        try:
+            first = TournamentParticipation(tournament_id=1, player_id=player_id, score=300, position=5)
+            db.add_all([first, TournamentParticipation(tournament_id=2, player_id=player_id, score=200, position=2)])
+            db.commit()
+            first.score = 350
+            db.commit()
+        finally:
+            db.close()
+        
+        expected = {"tournaments_played": 2, "best_position": 2, "total_score": 550, "power_ups_owned": 2}
+        response = client.get(f"/api/v1/players/{player_id}/profile")
+        assert response.status_code == 200
+        profile = response.json()
+        assert profile["username"] == authenticated_player["username"]
+        assert {key: profile[key] for key in expected} == expected
+        
+        # El rebuild por conjuntos debe llegar a los mismos totales
+        with engine.begin() as connection:
+            rebuild_player_stats(connection)
+        profile = client.get(f"/api/v1/players/{player_id}/profile").json()
+        assert {key: profile[key] for key in expected} == expected
+    
+    def test_player_stats_without_row_backfill_from_history(self, client, authenticated_player):
+        """Test: Sin fila en player_stats se parte del historial, no solo del delta"""
+        player_id = authenticated_player["id"]
+        with engine.begin() as connection:
+            # Historial previo a player_stats (p. ej. cargado a mano)
+            connection.execute(TournamentParticipation.__table__.insert(), [
+                {"tournament_id": 1, "player_id": player_id, "score": 700, "position": 1},
+                {"tournament_id": 2, "player_id": player_id, "score": 300, "position": 3},
+            ])
+            connection.execute(PlayerStats.__table__.delete().where(PlayerStats.player_id == player_id))
+        
+        db = SessionLocal()
+        try:
+            participations = db.query(TournamentParticipation).filter(
+                TournamentParticipation.player_id == player_id
+            ).order_by(TournamentParticipation.score).all()
+            participations[0].score = 350
+            db.commit()
+            profile = client.get(f"/api/v1/players/{player_id}/profile").json()
+            assert (profile["tournaments_played"], profile["total_score"], profile["best_position"]) == (2, 1050, 1)
+            
+            # Corregir la única mejor posición debe empeorar best_position
+            participations[1].position = 4
+            db.commit()
+            profile = client.get(f"/api/v1/players/{player_id}/profile").json()
+            assert profile["best_position"] == 3
+        finally:
+            db.close()
+    
+    def test_player_profile_not_found(self, client):
+        """Test de fallo: Perfil de jugador inexistente"""
+        response = client.get("/api/v1/players/999999/profile")
+        assert response.status_code == 404
+    
+    # TESTS PARA ARCHIVADO DE TORNEOS
+    def test_archive_completed_tournaments_falls_through(self, temp_db, client, authenticated_player):
+        """Test: Los torneos archivados salen de la base principal pero siguen consultables"""
+        player_id = authenticated_player["id"]
+        old_date = datetime.utcnow() - timedelta(days=90)
+        db = Session(bind=temp_db)
+        try:
+            old = [
+                Tournament(name=f"Galaga Classic {i}", game_title="Galaga", description="Archivable",
+                           start_date=old_date, end_date=old_date + timedelta(days=1), status="completed")
+                for i in range(2)
+            ]
+            recent = Tournament(name="Galaga Next", game_title="Galaga", description="En curso",
+                                start_date=datetime.utcnow(), end_date=datetime.utcnow() + timedelta(days=1),
+                                status="upcoming")
+            db.add_all(old + [recent])
+            db.flush()
+            db.add(TournamentParticipation(tournament_id=old[0].id, player_id=player_id, score=900, position=1))
+            db.add(TournamentParticipation(tournament_id=recent.id, player_id=player_id, score=0))
+            db.commit()
+            archived_ids, recent_id = [t.id for t in old], recent.id
+        finally:
+            db.close()
+        
+        assert archive_completed_tournaments(bind=temp_db, older_than_days=30, batch_size=1) == (2, 1)
+        
+        with temp_db.connect() as connection:
+            hot_ids = connection.execute(select(Tournament.id)).scalars().all()
+            assert hot_ids == [recent_id]
+            archived_rows = connection.execute(select(ArchivedTournament.id)).scalars().all()
+            assert sorted(archived_rows) == archived_ids
+        
+        response = client.get(f"/api/v1/tournaments/{archived_ids[0]}")
+        assert response.status_code == 200
+        assert response.json()["archived"] is True
+        assert response.json()["current_participants"] == 1
+        
+        hot = client.get("/api/v1/tournaments?status=completed&game_title=Galaga").json()
+        assert hot == []
+        history = client.get("/api/v1/tournaments?status=completed&game_title=Galaga&include_archived=true").json()
+        assert sorted(t["id"] for t in history) == archived_ids
+        
+        # Las estadísticas del perfil conservan el historial archivado
+        with temp_db.begin() as connection:
+            rebuild_player_stats(connection)
+        profile = client.get(f"/api/v1/players/{player_id}/profile").json()
+        assert profile["tournaments_played"] == 2
+        assert profile["total_score"] == 900
+        assert profile["best_position"] == 1
+    
+    # TESTS PARA SNAPSHOTS
+    def test_snapshot_export_import_roundtrip(self, temp_db, client, authenticated_player, tmp_path):
+        """Test: Exportar e importar debe conservar filas, índices y estadísticas"""
+        player_id = authenticated_player["id"]
+        with temp_db.begin() as connection:
+            connection.execute(PowerUp.__table__.insert(), [
+                {"name": "Speed Boost", "description": "Velocidad", "effect_type": "speed_boost", "effect_value": 1.5,
+                 "duration_minutes": 30, "rarity": "common", "price": 100}
+            ])
+        power_up_id = client.get("/api/v1/power-ups").json()[0]["id"]
+        client.post(f"/api/v1/players/{player_id}/purchases",
+                    json={"items": [{"power_up_id": power_up_id, "quantity": 3}]})
+        
+        snapshot_path = str(tmp_path / "snapshot.ndjson.gz")
+        exported = export_snapshot(snapshot_path, bind=temp_db)
+        imported = import_snapshot(snapshot_path, bind=temp_db)
+        assert imported == exported
+        assert exported["players"] == 1 and exported["purchases"] == 1
+        
+        profile = client.get(f"/api/v1/players/{player_id}/profile").json()
+        assert profile["username"] == authenticated_player["username"]
+        assert profile["power_ups_owned"] == 3
+        
+        # Los índices se reconstruyen tras la carga
+        indexes = {index["name"] for index in inspect(temp_db).get_indexes("player_power_ups")}
+        assert "ix_player_power_ups_player_power_up" in indexes
+        assert "ix_players_username" in {index["name"] for index in inspect(temp_db).get_indexes("players")}
+    
+    def test_snapshot_export_is_point_in_time(self, temp_db, tmp_path, monkeypatch):
+        """Test: Escrituras concurrentes entre tablas no dejan participaciones huérfanas"""
+        with temp_db.begin() as connection:
+            connection.exec_driver_sql("INSERT INTO players (username, email) VALUES ('first', 'first@retro.com')")
+            connection.exec_driver_sql("INSERT INTO tournament_participations (tournament_id, player_id, score) VALUES (1, 1, 10)")
+        original_dump = snapshot._dump
+        writes = []
+        
+        def dump_and_write(line):
+            # Justo antes de exportar participaciones, otro proceso confirma
+            # un jugador nuevo con su participación
+            if isinstance(line, dict) and line.get("table") == "tournament_participations":
+                writer = sqlite3.connect(temp_db.url.database, timeout=0)
+                try:
+                    cursor = writer.execute(
+                        "INSERT INTO players (username, email) VALUES (?, ?)",
+                        (f"late_{uuid.uuid4().hex[:8]}", f"late_{uuid.uuid4()}@retro.com")
+                    )
+                    writer.execute(
+                        "INSERT INTO tournament_participations (tournament_id, player_id, score) VALUES (1, ?, 10)",
+                        (cursor.lastrowid,)
+                    )
+                    writer.commit()
+                    writes.append(cursor.lastrowid)
+                except sqlite3.OperationalError:
+                    writer.rollback()  # Bloqueado por la lectura en curso: también es coherente
+                finally:
+                    writer.close()
+            return original_dump(line)
+        
+        monkeypatch.setattr(snapshot, "_dump", dump_and_write)
+        snapshot_path = tmp_path / "snapshot.ndjson.gz"
+        export_snapshot(str(snapshot_path), bind=temp_db)
+        
+        player_ids, participation_players, table = set(), set(), None
+        with gzip.open(snapshot_path, "rt") as lines:
+            next(lines)
+            for line in map(json.loads, lines):
+                if isinstance(line, dict):
+                    table, columns = line["table"], line["columns"]
+                elif table == "players":
+                    player_ids.add(line[columns.index("id")])
+                elif table == "tournament_participations":
+                    participation_players.add(line[columns.index("player_id")])
+        assert participation_players == player_ids == {1}
+        assert not set(writes) & participation_players
+    
+    def test_snapshot_import_replaces_archive_and_purchases(self, temp_db, client, authenticated_player, tmp_path):
+        """Test: Restaurar no mezcla historial archivado ni compras de jugadores anteriores"""
+        player_id = authenticated_player["id"]
+        with temp_db.begin() as connection:
+            connection.execute(PowerUp.__table__.insert(), [
+                {"name": "Shield", "description": "Escudo", "effect_type": "shield", "effect_value": 1.0,
+                 "duration_minutes": 15, "rarity": "rare", "price": 250}
+            ])
+        power_up_id = client.get("/api/v1/power-ups").json()[0]["id"]
+        client.post(f"/api/v1/players/{player_id}/purchases", headers={"Idempotency-Key": "restore-1"},
+                    json={"items": [{"power_up_id": power_up_id, "quantity": 1}]})
+        old_date = datetime.utcnow() - timedelta(days=90)
+        db = Session(bind=temp_db)
+        try:
+            old = Tournament(name="Frogger Classic", game_title="Frogger", description="Archivable",
+                             start_date=old_date, end_date=old_date, status="completed")
+            db.add(old)
+            db.flush()
+            db.add(TournamentParticipation(tournament_id=old.id, player_id=player_id, score=999, position=1))
+            db.commit()
+        finally:
+            db.close()
+        assert archive_completed_tournaments(bind=temp_db, older_than_days=30) == (1, 1)
+        
+        backup_path = str(tmp_path / "backup.ndjson.gz")
+        backup = export_snapshot(backup_path, bind=temp_db)
+        assert backup["archive.tournament_participations"] == 1
+        assert backup["purchases"] == 1
+        
+        seed_path = str(tmp_path / "seed.ndjson.gz")
+        generate_snapshot(seed_path, players=player_id, power_ups=5)
+        counts = import_snapshot(seed_path, bind=temp_db)
+        assert "purchases" not in counts
+        with temp_db.connect() as connection:
+            for name in ("purchases", "archive.tournaments", "archive.tournament_participations"):
+                table = Base.metadata.tables[name]
+                assert connection.execute(select(func.count()).select_from(table)).scalar() == 0
+        
+        with gzip.open(seed_path, "rt") as lines:
+            next(lines)
+            table, scores = None, []
+            for line in map(json.loads, lines):
+                if isinstance(line, dict):
+                    table, columns = line["table"], line["columns"]
+                elif table == "tournament_participations" and line[columns.index("player_id")] == player_id:
+                    scores.append(line[columns.index("score")])
+        profile = client.get(f"/api/v1/players/{player_id}/profile").json()
+        assert profile["username"] == f"player_{player_id}"
+        assert profile["total_score"] == sum(scores)
+        assert profile["tournaments_played"] == len(scores)
+        
+        # Restaurar la copia completa deja la base como estaba
+        assert import_snapshot(backup_path, bind=temp_db) == backup
+        profile = client.get(f"/api/v1/players/{player_id}/profile").json()
+        assert profile["username"] == authenticated_player["username"]
+        assert profile["total_score"] == 999
+        assert profile["tournaments_played"] == 1
+    
+    def test_snapshot_restore_into_fresh_database_keeps_archived_ids(self, temp_db, tmp_path):
+        """Test: Restaurar en una base nueva no reutiliza ids ya archivados"""
+        old_date = datetime.utcnow() - timedelta(days=90)
+        db = Session(bind=temp_db)
+        try:
+            old = [
+                Tournament(name=f"Dig Dug Classic {i}", game_title="Dig Dug", description="Archivable",
+                           start_date=old_date, end_date=old_date, status="completed")
+                for i in range(2)
+            ]
+            db.add_all(old)
+            db.flush()
+            db.add_all([TournamentParticipation(tournament_id=t.id, score=10) for t in old])
+            db.commit()
+        finally:
+            db.close()
+        assert archive_completed_tournaments(bind=temp_db, older_than_days=30) == (2, 2)
+        
+        snapshot_path = str(tmp_path / "snapshot.ndjson.gz")
+        export_snapshot(snapshot_path, bind=temp_db)
+        restored = create_temp_engine(tmp_path / "restored")
+        try:
+            import_snapshot(snapshot_path, bind=restored)
+            db = Session(bind=restored)
+            try:
+                tournament = Tournament(name="Dig Dug Revival", game_title="Dig Dug", description="Nuevo",
+                                        start_date=old_date, end_date=old_date, status="completed")
+                db.add(tournament)
+                db.flush()
+                participation = TournamentParticipation(tournament_id=tournament.id, score=20)
+                db.add(participation)
+                db.commit()
+                assert tournament.id == 3
+                assert participation.id == 3
+            finally:
+                db.close()
+            
+            # El siguiente archivado no choca con las claves archivadas
+            assert archive_completed_tournaments(bind=restored, older_than_days=30) == (1, 1)
+        finally:
+            restored.dispose()
+    
+    def test_snapshot_generate_scales_dataset(self, tmp_path):
+        """Test: El generador sintético debe producir el volumen pedido"""
+        counts = generate_snapshot(str(tmp_path / "seed.ndjson.gz"), players=300, power_ups=5)
+        assert counts["players"] == 300
+        assert counts["tournaments"] == 3
+        assert counts["player_power_ups"] == 600
+        assert counts["tournament_participations"] == 900
+    
+    # TESTS PARA MATCHMAKING
+    def test_matchmaking_pairs_same_bucket_first(self):
+        """Test exitoso: Debe emparejar primero a los jugadores del mismo bucket"""
+        service = MatchmakingService()
+        service.enqueue(1, "Tetris", 1000, now=0.0)
+        service.enqueue(2, "Tetris", 5000, now=0.0)
+        service.enqueue(3, "Tetris", 1050, now=0.0)
+        
+        matches = service.tick(now=0.0)
+        assert len(matches) == 1
+        assert set(matches[0].player_ids) == {1, 3}
+        assert service.status(1)["opponent_id"] == 3
+        assert service.status(2, now=0.0)["status"] == "waiting"
+        
+        # El resultado se olvida al superar el TTL
+        service.tick(now=service.match_ttl_seconds + 1)
+        assert service.status(1) is None
+        assert 1 not in service.matches and 3 not in service.matches
+    
+    def test_matchmaking_window_widens_over_time(self):
+        """Test: La ventana de búsqueda debe ampliarse con la espera"""
+        queue = MatchmakingQueue("Pac-Man", bucket_size=100, window_growth_seconds=10, max_window_buckets=3)
+        queue.enqueue(1, 1000, now=0.0)
+        queue.enqueue(2, 1250, now=0.0)
+        
+        assert queue.tick(iter(range(1, 10)), now=5.0) == []
+        matches = queue.tick(iter(range(1, 10)), now=20.0)
+        assert len(matches) == 1
+        assert matches[0].rating_gap == 250
+        assert len(queue) == 0
+    
+    def test_matchmaking_tick_work_is_bounded(self):
+        """Test: Cada ronda revisa como máximo max_tickets y rota los tickets sin rival"""
+        queue = MatchmakingQueue("Galaga", bucket_size=100, window_growth_seconds=1, max_window_buckets=2)
+        for player_id in range(1, 101):
+            queue.enqueue(player_id, player_id * 1000, now=0.0)  # Buckets aislados
+        queue.enqueue(1001, 500_000, now=0.0)
+        queue.enqueue(1002, 500_150, now=0.0)  # Bucket vecino, al final de la cola
+        
+        match_ids = iter(range(1, 100))
+        assert queue.tick(match_ids, now=10.0, max_tickets=10) == []
+        assert len(queue) == 102
+        
+        rounds = 0
+        matches = []
+        while not matches:
+            matches = queue.tick(match_ids, now=10.0, max_tickets=10)
+            rounds += 1
+        assert set(matches[0].player_ids) == {1001, 1002}
+        assert rounds <= 10
+    
+    def test_matchmaking_crowded_buckets_do_not_starve_neighbours(self):
+        """Test: Los buckets llenos se turnan y no bloquean la búsqueda en vecinos"""
+        queue = MatchmakingQueue("Galaga", bucket_size=100, window_growth_seconds=1, max_window_buckets=2)
+        queue.enqueue(1, 90_000, now=0.0)
+        queue.enqueue(2, 90_150, now=0.0)  # Solo emparejables entre buckets vecinos
+        
+        match_ids = iter(range(1, 1000))
+        ratings = {}
+        served = []
+        for round_number in range(2):
+            # Dos buckets que se rellenan en cada ronda por encima del presupuesto
+            for rating in (1_000, 5_000):
+                for _ in range(20):
+                    player_id = 100 + len(ratings)
+                    ratings[player_id] = rating
+                    queue.enqueue(player_id, rating, now=10.0)
+            matches = queue.tick(match_ids, now=10.0, max_tickets=10)
+            if round_number == 0:
+                assert {1, 2} in [set(match.player_ids) for match in matches]
+            served.append({ratings[match.player_ids[0]] for match in matches
+                           if match.player_ids[0] in ratings})
+        
+        # Cada ronda empieza por un bucket lleno distinto
+        assert served[0] != served[1]
+        assert served[0] | served[1] == {1_000, 5_000}
+    
+    def test_matchmaking_enqueue_status_dequeue(self, client, authenticated_player):
+        """Test de endpoints: Entrar, consultar y salir de la cola"""
+        player_id = authenticated_player["id"]
+        queue_data = {"player_id": player_id, "game_title": "Street Fighter II"}
+        
+        # Solo el propio jugador autenticado puede entrar o salir de la cola
+        other_id = client.post("/api/v1/players", json={
+            "username": "rival_" + str(uuid.uuid4())[:8], "email": f"rival_{uuid.uuid4()}@retro.com"
+        }).json()["id"]
+        assert client.post("/api/v1/matchmaking/queue",
+                           json={**queue_data, "player_id": other_id}).status_code == 403
+        
+        response = client.post("/api/v1/matchmaking/queue", json=queue_data)
+        assert response.status_code == 201
+        assert response.json()["status"] == "waiting"
+        assert response.json()["rating"] == 1000
+        
+        # No se puede entrar dos veces
+        assert client.post("/api/v1/matchmaking/queue", json=queue_data).status_code == 400
+        assert client.get(f"/api/v1/matchmaking/queue/{player_id}").status_code == 200
+        assert client.delete(f"/api/v1/matchmaking/queue/{other_id}").status_code == 403
+        assert client.delete(f"/api/v1/matchmaking/queue/{player_id}").status_code == 200
+        assert client.get(f"/api/v1/matchmaking/queue/{player_id}").status_code == 404
+        assert not matchmaking_service.is_queued(player_id)
+        # La cola vacía se descarta
+        assert "Street Fighter II" not in matchmaking_service.queues